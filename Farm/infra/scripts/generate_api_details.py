@@ -1,102 +1,175 @@
+import io
+import os
 import json
 import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 spec_path = r"C:\Users\Deepak\OneDrive\Desktop\PHPFrarm\Farm\docs\architecture\openapi.json"
 out_path = r"C:\Users\Deepak\OneDrive\Desktop\PHPFrarm\Farm\docs\architecture\API_DETAILS.md"
 
-with open(spec_path, "r", encoding="utf-8-sig") as f:
-    spec = json.load(f)
-
-global_security = spec.get("security")
-
-lines = []
-lines.append("# API Details")
-lines.append(f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-lines.append("")
-lines.append("## Required Headers")
-lines.append("- X-Correlation-Id (ULID, required)")
-lines.append("- X-Transaction-Id (ULID, required)")
-lines.append("- X-Request-Id (ULID, required)")
-lines.append("- Accept: application/json")
-lines.append("- Authorization: Bearer <token> (required for protected endpoints)")
-lines.append("")
-lines.append("## Standard Response Envelope")
-lines.append("- success: boolean")
-lines.append("- message: string")
-lines.append("- data: object|array|null")
-lines.append("- meta: object (timestamp, api_version, locale, pagination if applicable)")
-lines.append("- trace: object (correlation_id, transaction_id, request_id)")
-lines.append("")
-
-paths = spec.get("paths", {})
-for path in sorted(paths.keys()):
-    methods = paths[path]
-    for method in sorted(methods.keys()):
+HEADER = """\
+## Required Headers
+- X-Correlation-Id (ULID, required)
+- X-Transaction-Id (ULID, required)
+- X-Request-Id (ULID, required)
+- Accept: application/json
+- Authorization: Bearer <token> (required for protected endpoints)
+
+## Standard Response Envelope
+- success: boolean
+- message: string
+- data: object|array|null
+- meta: object (timestamp, api_version, locale, pagination if applicable)
+- trace: object (correlation_id, transaction_id, request_id)
+
+"""
+
+
+def open_spec():
+    f = open(spec_path, "rb")
+    if f.read(3) != b"\xef\xbb\xbf":
+        f.seek(0)
+    return f
+
+
+def paths_event(spec_file):
+    # kvitems yields nothing for a "paths" that is not an object, so peek at the
+    # event that opens it; the spec is left as soon as "paths" is reached.
+    for prefix, event, _ in ijson.parse(spec_file):
+        if prefix == "paths":
+            return event
+    return None
+
+
+def check_paths_shape(is_object):
+    if not is_object:
+        raise ValueError(f"{spec_path}: 'paths' must be a JSON object")
+
+
+def write_operations(w, path, methods):
+    for method, op in sorted(methods.items()):
         if method.lower() not in {"get", "post", "put", "patch", "delete"}:
             continue
-        op = methods[method]
+        get = op.get
+        summary = get("summary")
+        description = get("description")
+        tags = get("tags")
+        params = get("parameters") or []
+        req_body = get("requestBody")
+        responses = get("responses") or {}
+
         m = method.upper()
-        lines.append(f"## {m} {path}")
-        if op.get("summary"):
-            lines.append(f"**Summary:** {op['summary']}")
-        if op.get("description"):
-            lines.append(f"**Description:** {op['description']}")
-        if op.get("tags"):
-            lines.append("**Tags:** " + ", ".join(op["tags"]))
-
-        security = op.get("security") or global_security
-        lines.append("**Auth:** " + ("Required" if security else "None"))
-        lines.append("")
-
-        params = op.get("parameters") or []
+        w(f"## {m} {path}\n")
+        if summary:
+            w(f"**Summary:** {summary}\n")
+        if description:
+            w(f"**Description:** {description}\n")
+        if tags:
+            w("**Tags:** " + ", ".join(tags) + "\n")
+
+        security = get("security") or global_security
+        w("**Auth:** " + ("Required" if security else "None") + "\n")
+        w("\n")
+
         if params:
-            lines.append("**Parameters:**")
+            w("**Parameters:**\n")
             for p in params:
                 required = "required" if p.get("required") else "optional"
                 schema = p.get("schema") or {}
                 schema_type = schema.get("type", "object")
-                lines.append(f"- {p.get('in')} {p.get('name')} ({schema_type}, {required})")
-            lines.append("")
+                w(f"- {p.get('in')} {p.get('name')} ({schema_type}, {required})\n")
+            w("\n")
 
-        req_body = op.get("requestBody")
         if req_body:
-            lines.append("**Request Body:**")
+            w("**Request Body:**\n")
             content = req_body.get("content", {})
             for ctype, cval in content.items():
                 schema = cval.get("schema", {})
                 schema_ref = schema.get("$ref")
                 schema_type = schema.get("type")
                 if schema_ref:
-                    lines.append(f"- {ctype}: {schema_ref}")
+                    w(f"- {ctype}: {schema_ref}\n")
                 elif schema_type:
-                    lines.append(f"- {ctype}: {schema_type}")
+                    w(f"- {ctype}: {schema_type}\n")
                 else:
-                    lines.append(f"- {ctype}: schema")
-            lines.append("")
+                    w(f"- {ctype}: schema\n")
+            w("\n")
 
-        responses = op.get("responses") or {}
         if responses:
-            lines.append("**Responses:**")
-            for code in sorted(responses.keys()):
-                resp = responses[code]
-                lines.append(f"- {code}: {resp.get('description', '')}")
+            w("**Responses:**\n")
+            for code, resp in sorted(responses.items()):
+                w(f"- {code}: {resp.get('description', '')}\n")
                 content = resp.get("content") or {}
                 for ctype, cval in content.items():
                     schema = cval.get("schema", {})
                     schema_ref = schema.get("$ref")
                     schema_type = schema.get("type")
                     if schema_ref:
-                        lines.append(f"  - {ctype}: {schema_ref}")
+                        w(f"  - {ctype}: {schema_ref}\n")
                     elif schema_type:
-                        lines.append(f"  - {ctype}: {schema_type}")
+                        w(f"  - {ctype}: {schema_type}\n")
                     else:
-                        lines.append(f"  - {ctype}: schema")
-            lines.append("")
+                        w(f"  - {ctype}: schema\n")
+            w("\n")
+
+        w("---\n")
+        w("\n")
+
+
+if ijson:
+    # Stream the spec instead of loading it whole; only the paths object is large.
+    with open_spec() as spec_file:
+        global_security = next(ijson.items(spec_file, "security"), None)
+    # kvitems yields paths in document order; render each one as it is parsed and
+    # keep only its markdown. Done before opening the output so a broken spec
+    # leaves the existing file untouched.
+    with open_spec() as spec_file:
+        event = paths_event(spec_file)
+    check_paths_shape(event in (None, "start_map"))
+    blocks = []
+    with open_spec() as spec_file:
+        for path, methods in ijson.kvitems(spec_file, "paths", use_float=True):
+            buf = io.StringIO()
+            write_operations(buf.write, path, methods)
+            blocks.append((path, buf.getvalue()))
+    blocks.sort(key=lambda block: block[0])
+else:
+    with open_spec() as spec_file:
+        raw = spec_file.read()
+    spec = orjson.loads(raw) if orjson else json.loads(raw)
+    global_security = spec.get("security")
+    paths = spec.get("paths", {})
+    check_paths_shape(isinstance(paths, dict))
 
-        lines.append("---")
-        lines.append("")
+# Render next to the target and swap it in only once rendering succeeded, so a
+# spec that fails halfway leaves the existing document untouched.
+tmp_path = out_path + ".tmp"
+try:
+    with open(tmp_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        w = f.write
+        w("# API Details\n")
+        w(f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        w("\n")
+        w(HEADER)
 
-with open(out_path, "w", encoding="utf-8") as f:
-    f.write("\n".join(lines))
+        if ijson:
+            for _, text in blocks:
+                w(text)
+        else:
+            for path, methods in sorted(paths.items()):
+                write_operations(w, path, methods)
+    os.replace(tmp_path, out_path)
+finally:
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
 
 print(f"API details written to {out_path}")
@@ -1,6 +1,12 @@
 import os
-import re
+import sys
+import json
 import datetime
+from concurrent.futures import ProcessPoolExecutor
+from operator import attrgetter
+
+import route_scanner
+from route_scanner import SCANNER_VERSION, Route, parse_file
 
 ROOT = r"C:\Users\Deepak\OneDrive\Desktop\PHPFrarm\Farm"
 APP_DIRS = [
@@ -14,225 +20,217 @@ CONTROLLER_DIRS = [
     os.path.join(ROOT, "backend", "modules", "Storage", "Controllers"),
 ]
 OUT_PATH = os.path.join(ROOT, "docs", "architecture", "API_DETAILS.md")
+CACHE_PATH = os.path.join(ROOT, ".route_parse_cache.json")
+PARALLEL_MIN_FILES = 64
+
+HEADER = """\
+## Required Headers
+- X-Correlation-Id (ULID, required)
+- X-Transaction-Id (ULID, required)
+- X-Request-Id (ULID, required)
+- Accept: application/json
+- Authorization: Bearer <token> (required for protected endpoints)
+
+## Standard Response Envelope
+- success: boolean
+- message: string
+- data: object|array|null
+- meta: object (timestamp, api_version, locale, pagination if applicable)
+- trace: object (correlation_id, transaction_id, request_id)
+
+"""
+
+
+def iter_php_files(base):
+    # Same top-down order as os.walk, but DirEntry.is_dir() reuses the d_type
+    # from the directory listing instead of a stat() per entry. Yields the
+    # DirEntry so callers can use its cached stat() (free on Windows).
+    stack = [base]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.name.endswith('.php') and entry.is_file():
+                yield entry
+        stack.extend(reversed(subdirs))
+
+
+def scanner_stamp():
+    # Cached results belong to the scanner that produced them: its version plus the
+    # module actually imported (source or compiled extension) and its mtime.
+    module_path = route_scanner.__file__
+    return [SCANNER_VERSION, module_path, os.stat(module_path).st_mtime_ns]
+
+
+def warn_if_stale_extension():
+    module_path = route_scanner.__file__
+    source_path = os.path.join(os.path.dirname(module_path), 'route_scanner.py')
+    if module_path == source_path or not os.path.exists(source_path):
+        return
+    if os.stat(source_path).st_mtime_ns > os.stat(module_path).st_mtime_ns:
+        print(f"warning: {module_path} is older than route_scanner.py; "
+              "rebuild it with mypyc or delete it", file=sys.stderr)
+
+
+def load_parse_cache():
+    try:
+        with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get('version') != scanner_stamp():
+        return {}
+    files = cache.get('files') or {}
+    if not isinstance(files, dict):
+        return {}
+    try:
+        for entry in files.values():
+            entry['routes'] = [Route.from_row(row) for row in entry['routes']]
+            entry['router_routes'] = [Route.from_row(row) for row in entry['router_routes']]
+    except (KeyError, TypeError, ValueError):
+        # A damaged entry invalidates the whole cache; everything is re-parsed.
+        return {}
+    return files
+
+
+def save_parse_cache(files):
+    rows = {
+        path: {
+            'stat': entry['stat'],
+            'routes': [r.as_row() for r in entry['routes']],
+            'router_routes': [r.as_row() for r in entry['router_routes']],
+        }
+        for path, entry in files.items()
+    }
+    try:
+        with open(CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump({'version': scanner_stamp(), 'files': rows}, f)
+    except OSError:
+        pass
 
-route_group_re = re.compile(r"#\[RouteGroup\(([^\)]*)\)\]")
-route_re = re.compile(r"#\[Route\(([^\)]*)\)\]")
-router_group_re = re.compile(r"Router::group\('([^']+)'\s*,\s*\[([^\]]*)\]", re.IGNORECASE)
-router_route_re = re.compile(r"Router::(get|post|put|patch|delete)\('([^']+)'\s*,\s*\[([^\]]+)\]", re.IGNORECASE)
-function_re = re.compile(r"function\s+([a-zA-Z0-9_]+)\s*\(")
-class_re = re.compile(r"class\s+([A-Za-z0-9_]+)")
-
-string_re = re.compile(r"'([^']*)'")
-
-
-def parse_route_args(arg_text: str):
-    path = None
-    method = None
-    description = None
-    middleware = []
-
-    strings = string_re.findall(arg_text)
-    if strings:
-        path = strings[0]
-
-    method_match = re.search(r"method\s*:\s*'([^']+)'", arg_text)
-    if method_match:
-        method = method_match.group(1).upper()
-
-    desc_match = re.search(r"description\s*:\s*'([^']+)'", arg_text)
-    if desc_match:
-        description = desc_match.group(1)
-
-    middleware_match = re.search(r"middleware\s*:\s*\[([^\]]*)\]", arg_text)
-    if middleware_match:
-        middleware = [m.strip().strip("'") for m in middleware_match.group(1).split(',') if m.strip()]
 
-    return path, method, description, middleware
+def parse_files(paths):
+    # Spawning workers only pays off once there is a meaningful amount of regex work.
+    if len(paths) < PARALLEL_MIN_FILES:
+        return [parse_file(path) for path in paths]
+    with ProcessPoolExecutor() as executor:
+        return list(executor.map(parse_file, paths, chunksize=32))
 
 
 def collect_routes():
     routes = []
+    router_routes = []
     files_with_routes = set()
+    all_php_files = set()
     skipped_files = {
         os.path.join(ROOT, "backend", "app", "Console", "Commands", "MakeModuleCommand.php"),
     }
+    cache = load_parse_cache()
+    fresh_cache = {}
 
+    stamps = {}
+    pending = []
     for base in APP_DIRS:
-        for root, _, files in os.walk(base):
-            for file in files:
-                if not file.endswith('.php'):
-                    continue
-                path = os.path.join(root, file)
-                if path in skipped_files:
-                    continue
-                with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
-
-                current_group = ''
-                current_class = None
-                in_block_comment = False
-
-                for i, line in enumerate(lines):
-                    stripped = line.lstrip()
-                    if '/*' in stripped:
-                        in_block_comment = True
-                    if '*/' in stripped:
-                        in_block_comment = False
-                        continue
-
-                    if in_block_comment or stripped.startswith('//') or stripped.startswith('*'):
-                        continue
-
-                    group_match = route_group_re.search(line)
-                    if group_match:
-                        group_args = group_match.group(1)
-                        group_strings = string_re.findall(group_args)
-                        if group_strings:
-                            current_group = group_strings[0]
-
-                    class_match = class_re.search(line)
-                    if class_match:
-                        current_class = class_match.group(1)
-
-                    route_match = route_re.search(line)
-                    if route_match:
-                        args = route_match.group(1)
-                        path_part, method, description, middleware = parse_route_args(args)
-                        if not method:
-                            method = 'GET'
-                        function_name = None
-                        for j in range(i + 1, min(i + 6, len(lines))):
-                            func_match = function_re.search(lines[j])
-                            if func_match:
-                                function_name = func_match.group(1)
-                                break
-
-                        full_path = (current_group or '') + (path_part or '')
-                        routes.append({
-                            'method': method,
-                            'path': full_path if full_path else (path_part or ''),
-                            'description': description or '',
-                            'controller': current_class or '',
-                            'handler': function_name or '',
-                            'source': path,
-                            'middleware': middleware
-                        })
-                        files_with_routes.add(path)
-
-    # Parse routes.php files using Router::group and Router::get/post...
-    for base in APP_DIRS:
-        for root, _, files in os.walk(base):
-            for file in files:
-                if file != 'routes.php':
-                    continue
-                path = os.path.join(root, file)
-                with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-
-                group_prefix = ''
-                group_middleware = []
-                group_match = router_group_re.search(content)
-                if group_match:
-                    group_prefix = group_match.group(1)
-                    group_middleware = [m.strip().strip("'") for m in group_match.group(2).split(',') if m.strip()]
-
-                for match in router_route_re.finditer(content):
-                    method = match.group(1).upper()
-                    rel_path = match.group(2)
-                    handler = match.group(3).strip()
-                    full_path = (group_prefix or '') + rel_path
-                    routes.append({
-                        'method': method,
-                        'path': full_path,
-                        'description': 'Router route',
-                        'controller': handler,
-                        'handler': '',
-                        'source': path,
-                        'middleware': group_middleware
-                    })
-                    files_with_routes.add(path)
-
-    return routes, files_with_routes
-
-
-def write_markdown(routes, files_with_routes):
-    routes = sorted(routes, key=lambda r: (r['path'], r['method']))
+        for php_entry in iter_php_files(base):
+            path = php_entry.path
+            all_php_files.add(path)
+            if path in skipped_files:
+                continue
+            st = php_entry.stat()
+            stamps[path] = [st.st_mtime_ns, st.st_size]
+            entry = cache.get(path)
+            if entry is None or entry.get('stat') != stamps[path]:
+                pending.append(path)
+
+    for path, (parsed, router_parsed) in zip(pending, parse_files(pending)):
+        cache[path] = {'stat': stamps[path], 'routes': parsed, 'router_routes': router_parsed}
+
+    for path in stamps:
+        entry = fresh_cache[path] = cache[path]
+        if entry['routes']:
+            routes.extend(entry['routes'])
+            files_with_routes.add(path)
+        # Kept apart so routes.php entries still follow attribute routes.
+        if entry['router_routes']:
+            router_routes.extend(entry['router_routes'])
+            files_with_routes.add(path)
+
+    routes.extend(router_routes)
+    save_parse_cache(fresh_cache)
+    return routes, files_with_routes, all_php_files
+
+
+def write_markdown(routes, files_with_routes, all_php_files):
+    routes.sort(key=attrgetter('path', 'method'))
     total_routes = len(routes)
-    attr_routes = len([r for r in routes if r['source'].endswith('.php') and 'routes.php' not in r['source']])
-    router_routes = len([r for r in routes if r['source'].endswith('routes.php')])
-
-    controller_files = []
-    for base in CONTROLLER_DIRS:
-        if not os.path.isdir(base):
-            continue
-        for root, _, files in os.walk(base):
-            for file in files:
-                if file.endswith('.php'):
-                    controller_files.append(os.path.join(root, file))
+    attr_routes = len([r for r in routes if r.source.endswith('.php') and 'routes.php' not in r.source])
+    router_routes = len([r for r in routes if r.source.endswith('routes.php')])
 
+    # CONTROLLER_DIRS all sit inside APP_DIRS, so the files were already enumerated.
+    controller_prefixes = tuple(os.path.join(base, '') for base in CONTROLLER_DIRS)
     controllers_without_routes = sorted([
-        f for f in controller_files if f not in files_with_routes
+        f for f in all_php_files if f.startswith(controller_prefixes) and f not in files_with_routes
     ])
 
-    lines = []
-    lines.append("# API Details (Parsed from Code)")
-    lines.append(f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    lines.append("")
-    lines.append("## Coverage Summary")
-    lines.append(f"- Total routes: {total_routes}")
-    lines.append(f"- Attribute routes: {attr_routes}")
-    lines.append(f"- routes.php routes: {router_routes}")
-    if controllers_without_routes:
-        lines.append(f"- Controllers without routes: {len(controllers_without_routes)}")
-    else:
-        lines.append("- Controllers without routes: 0")
-    lines.append("")
-
-    if controllers_without_routes:
-        lines.append("## Potentially Missing Routes (Controllers without Route attributes)")
-        for f in controllers_without_routes:
-            lines.append(f"- {f}")
-        lines.append("")
-
-    lines.append("## Required Headers")
-    lines.append("- X-Correlation-Id (ULID, required)")
-    lines.append("- X-Transaction-Id (ULID, required)")
-    lines.append("- X-Request-Id (ULID, required)")
-    lines.append("- Accept: application/json")
-    lines.append("- Authorization: Bearer <token> (required for protected endpoints)")
-    lines.append("")
-    lines.append("## Standard Response Envelope")
-    lines.append("- success: boolean")
-    lines.append("- message: string")
-    lines.append("- data: object|array|null")
-    lines.append("- meta: object (timestamp, api_version, locale, pagination if applicable)")
-    lines.append("- trace: object (correlation_id, transaction_id, request_id)")
-    lines.append("")
-
-    current_path = None
-    for r in routes:
-        if r['path'] != current_path:
-            current_path = r['path']
-            lines.append(f"## {current_path}")
-
-        lines.append(f"- **{r['method']}** — {r['description'] or 'No description'}")
-        if r['controller'] or r['handler']:
-            if r['handler']:
-                lines.append(f"  - Handler: {r['controller']}::{r['handler']}")
+    # Rendered next to the target and swapped in only once complete.
+    tmp_path = OUT_PATH + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            w = f.write
+            w("# API Details (Parsed from Code)\n")
+            w(f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            w("\n")
+            w("## Coverage Summary\n")
+            w(f"- Total routes: {total_routes}\n")
+            w(f"- Attribute routes: {attr_routes}\n")
+            w(f"- routes.php routes: {router_routes}\n")
+            if controllers_without_routes:
+                w(f"- Controllers without routes: {len(controllers_without_routes)}\n")
             else:
-                lines.append(f"  - Handler: {r['controller']}")
-        if r.get('middleware'):
-            lines.append(f"  - Middleware: {', '.join(r['middleware'])}")
-        lines.append(f"  - Source: {r['source']}")
-        lines.append("")
-
-    with open(OUT_PATH, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
+                w("- Controllers without routes: 0\n")
+            w("\n")
+
+            if controllers_without_routes:
+                w("## Potentially Missing Routes (Controllers without Route attributes)\n")
+                for controller_file in controllers_without_routes:
+                    w(f"- {controller_file}\n")
+                w("\n")
+
+            w(HEADER)
+
+            current_path = None
+            for r in routes:
+                if r.path != current_path:
+                    current_path = r.path
+                    w(f"## {current_path}\n")
+
+                w(f"- **{r.method}** — {r.description or 'No description'}\n")
+                if r.controller or r.handler:
+                    if r.handler:
+                        w(f"  - Handler: {r.controller}::{r.handler}\n")
+                    else:
+                        w(f"  - Handler: {r.controller}\n")
+                if r.middleware:
+                    w(f"  - Middleware: {', '.join(r.middleware)}\n")
+                w(f"  - Source: {r.source}\n")
+                w("\n")
+        os.replace(tmp_path, OUT_PATH)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
 
 def main():
-    routes, files_with_routes = collect_routes()
-    write_markdown(routes, files_with_routes)
+    warn_if_stale_extension()
+    routes, files_with_routes, all_php_files = collect_routes()
+    write_markdown(routes, files_with_routes, all_php_files)
 
 
 if __name__ == '__main__':
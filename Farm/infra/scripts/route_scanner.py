@@ -0,0 +1,295 @@
+# Per-file PHP route scanner used by generate_api_details_from_code.py.
+#
+# Kept free of filesystem walking and caching and fully annotated so it can be
+# compiled with mypyc (`mypyc route_scanner.py`). A compiled route_scanner.*.so
+# (.pyd on Windows) next to this file is imported in its place, so rebuild or
+# delete it after editing this file; the generator warns when it is older.
+import os
+import re
+import sys
+from bisect import bisect_right
+from typing import Any, Iterator, Optional
+
+try:
+    import hyperscan  # type: ignore[import-not-found]
+except ImportError:
+    hyperscan = None  # type: ignore[assignment]
+
+# Part of the generator's parse cache key; bump whenever a change here alters what
+# parse_file returns for the same input.
+SCANNER_VERSION = 10
+
+# Every character class below stops at the delimiter that follows it and no
+# quantified group can match the same text two ways, so the scans stay linear
+# without possessive quantifiers or the third-party regex module.
+# Whole-file scans run on raw bytes; only the captured fragments are decoded.
+# RouteGroup, class and Route declarations in one pass; dispatch on match.lastgroup.
+# A Route also looks ahead up to five lines (\n, \r\n or bare \r ends) for its handler;
+# the lookahead does not consume anything, so stacked (repeatable) Route attributes
+# still match on their own.
+attribute_re = re.compile(
+    rb"(?P<group>#\[RouteGroup\((?P<group_args>[^\)]*)\)\])"
+    rb"|(?P<cls>class\s+(?P<class_name>[A-Za-z0-9_]+))"
+    rb"|(?P<route>#\[Route\((?P<route_args>[^\)]*)\)\]"
+    rb"(?:(?=[^\r\n]*(?:\r\n?|\n)(?:[^\r\n]*(?:\r\n?|\n)){0,4}?[^\r\n]*?function\s+(?P<handler>[a-zA-Z0-9_]+)\s*\())?)"
+)
+# Literal heads of the attribute_re alternatives. With hyperscan installed these are
+# located in one SIMD pass and attribute_re only runs at the reported offsets.
+attribute_heads = [rb"#\[Route", rb"class\s+[A-Za-z0-9_]"]
+attribute_db: Any = None
+# Comment openers (/*, // and # but not #[), heredoc/nowdoc openers and whole
+# string literals, so a comment marker or quote inside any of them is skipped.
+comment_re = re.compile(
+    rb"(?P<block>/\*)"
+    rb"|(?P<line>//|#(?!\[))"
+    rb"|<<<[ \t]*(?P<quote>[\"']?)(?P<heredoc>[A-Za-z_][A-Za-z0-9_]*)(?P=quote)[ \t]*(?:\r\n?|\n)"
+    rb"|'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"",
+    re.DOTALL,
+)
+line_end_re = re.compile(rb"[\r\n]")
+# Router::group and Router::get/post/... in one pass, so groups apply in declaration order.
+router_re = re.compile(
+    rb"Router::group\('(?P<group_prefix>[^']+)'\s*,\s*\[(?P<group_middleware>[^\]]*)\]"
+    rb"(?:\s*,\s*(?:static\s+)?(?:(?P<group_closure>function)|(?P<group_arrow>fn))\b)?"
+    rb"|Router::(?P<method>get|post|put|patch|delete)\('(?P<path>[^']+)'\s*,\s*\[(?P<handler>[^\]]+)\]",
+    re.IGNORECASE,
+)
+brace_re = re.compile(rb"[{}]")
+
+string_re = re.compile(r"'([^']*)'")
+method_re = re.compile(r"method\s*:\s*'([^']+)'")
+desc_re = re.compile(r"description\s*:\s*'([^']+)'")
+middleware_re = re.compile(r"middleware\s*:\s*\[([^\]]*)\]")
+
+
+class Route:
+    __slots__ = ('method', 'path', 'description', 'controller', 'handler', 'source', 'middleware')
+
+    method: str
+    path: str
+    description: str
+    controller: str
+    handler: str
+    source: str
+    middleware: list[str]
+
+    def __init__(self, method: str, path: str, description: str, controller: str, handler: str,
+                 source: str, middleware: list[str]) -> None:
+        self.method = method
+        self.path = path
+        self.description = description
+        self.controller = controller
+        self.handler = handler
+        self.source = source
+        self.middleware = middleware
+
+    @classmethod
+    def from_row(cls, row: list[Any]) -> 'Route':
+        method, path, description, controller, handler, source, middleware = row
+        # Source files and controllers repeat across routes; share one string for each.
+        return cls(method, path, description, sys.intern(controller), handler, sys.intern(source), middleware)
+
+    def as_row(self) -> list[Any]:
+        return [self.method, self.path, self.description, self.controller, self.handler, self.source, self.middleware]
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Explicit so routes still pickle across the worker pool when compiled by mypyc.
+        return (Route, tuple(self.as_row()))
+
+
+def to_text(raw: bytes) -> str:
+    return raw.decode('utf-8', errors='ignore')
+
+
+def parse_route_args(arg_text: str) -> tuple[Optional[str], Optional[str], Optional[str], list[str]]:
+    path = None
+    method = None
+    description = None
+    middleware: list[str] = []
+
+    strings = string_re.findall(arg_text)
+    if strings:
+        path = strings[0]
+
+    method_match = method_re.search(arg_text)
+    if method_match:
+        method = method_match.group(1).upper()
+
+    desc_match = desc_re.search(arg_text)
+    if desc_match:
+        description = desc_match.group(1)
+
+    middleware_match = middleware_re.search(arg_text)
+    if middleware_match:
+        middleware = [m.strip().strip("'") for m in middleware_match.group(1).split(',') if m.strip()]
+
+    return path, method, description, middleware
+
+
+def attribute_matches(data: bytes) -> Iterator['re.Match[bytes]']:
+    # Same matches, in the same order, as attribute_re.finditer(data).
+    global attribute_db
+    if hyperscan is None:
+        yield from attribute_re.finditer(data)
+        return
+    if attribute_db is None:
+        attribute_db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        attribute_db.compile(
+            expressions=attribute_heads,
+            ids=list(range(len(attribute_heads))),
+            elements=len(attribute_heads),
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(attribute_heads),
+        )
+
+    starts: set[int] = set()
+
+    def on_match(pattern_id: int, start: int, end: int, flags: int, context: Any) -> None:
+        starts.add(start)
+
+    attribute_db.scan(data, match_event_handler=on_match)
+    last_end = 0
+    for start in sorted(starts):
+        if start < last_end:
+            continue
+        match = attribute_re.match(data, start)
+        if match:
+            last_end = match.end()
+            yield match
+
+
+def heredoc_end(data: bytes, name: bytes, start: int) -> int:
+    # The closing identifier starts a line, optionally indented (PHP 7.3+).
+    closing = re.compile(rb"(?<![^\r\n])[ \t]*" + re.escape(name) + rb"(?![A-Za-z0-9_])")
+    match = closing.search(data, start)
+    return match.end() if match else len(data)
+
+
+def comment_spans(data: bytes) -> list[tuple[int, int]]:
+    # (start, end) offsets of /* */ blocks, // and # line comments and heredoc/nowdoc
+    # bodies outside string literals, in file order.
+    spans: list[tuple[int, int]] = []
+    pos = 0
+    while True:
+        match = comment_re.search(data, pos)
+        if match is None:
+            break
+        start = match.start()
+        if match.group('block') is not None:
+            close = data.find(b'*/', match.end())
+            pos = close + 2 if close >= 0 else len(data)
+            spans.append((start, pos))
+        elif match.group('line') is not None:
+            line_end = line_end_re.search(data, match.end())
+            pos = line_end.start() if line_end else len(data)
+            spans.append((start, pos))
+        elif match.group('heredoc') is not None:
+            pos = heredoc_end(data, match.group('heredoc'), match.end())
+            spans.append((start, pos))
+        else:
+            pos = match.end()
+    return spans
+
+
+def parse_attribute_routes(path: str, data: bytes) -> list[Route]:
+    routes: list[Route] = []
+    path = sys.intern(path)
+    spans = comment_spans(data)
+    span_starts = [start for start, _ in spans]
+
+    current_group = ''
+    current_class: Optional[str] = None
+
+    for match in attribute_matches(data):
+        k = bisect_right(span_starts, match.start()) - 1
+        if k >= 0 and match.start() < spans[k][1]:
+            continue
+
+        kind = match.lastgroup
+        if kind == 'group':
+            group_strings = string_re.findall(to_text(match.group('group_args')))
+            if group_strings:
+                current_group = group_strings[0]
+        elif kind == 'cls':
+            current_class = sys.intern(to_text(match.group('class_name')))
+        else:
+            path_part, method, description, middleware = parse_route_args(to_text(match.group('route_args')))
+            if not method:
+                method = 'GET'
+            handler = match.group('handler')
+            function_name = to_text(handler) if handler else None
+
+            full_path = (current_group or '') + (path_part or '')
+            routes.append(Route(
+                method,
+                full_path if full_path else (path_part or ''),
+                description or '',
+                current_class or '',
+                function_name or '',
+                path,
+                middleware,
+            ))
+
+    return routes
+
+
+def closure_end(data: bytes, start: int) -> int:
+    # Offset just past the brace closing the first {...} block at or after start.
+    open_at = data.find(b'{', start)
+    if open_at < 0:
+        return len(data)
+    depth = 0
+    for match in brace_re.finditer(data, open_at):
+        depth += 1 if match.group() == b'{' else -1
+        if depth == 0:
+            return match.end()
+    return len(data)
+
+
+def parse_router_routes(path: str, data: bytes) -> list[Route]:
+    # Parse routes.php files using Router::group and Router::get/post...
+    # Like Router::group itself, a group's prefix and middleware apply only inside its
+    # closure and nested groups extend the enclosing ones.
+    routes: list[Route] = []
+    path = sys.intern(path)
+    scopes: list[tuple[int, str, list[str]]] = []
+    for match in router_re.finditer(data):
+        while scopes and match.start() >= scopes[-1][0]:
+            scopes.pop()
+        group_prefix = scopes[-1][1] if scopes else ''
+        group_middleware = scopes[-1][2] if scopes else []
+
+        if match.group('group_prefix') is not None:
+            # Only an inline closure bounds the group; a callable such as
+            # [Ctl::class, 'register'] or $fn registers its routes elsewhere.
+            if match.group('group_closure') is not None:
+                end = closure_end(data, match.end())
+            elif match.group('group_arrow') is not None:
+                # An arrow function's body is one expression, so it ends at the call's ';'.
+                semicolon = data.find(b';', match.end())
+                end = semicolon if semicolon >= 0 else len(data)
+            else:
+                continue
+            middleware = [m.strip().strip("'") for m in to_text(match.group('group_middleware')).split(',') if m.strip()]
+            scopes.append((
+                end,
+                group_prefix + to_text(match.group('group_prefix')),
+                group_middleware + middleware,
+            ))
+            continue
+
+        method = to_text(match.group('method')).upper()
+        rel_path = to_text(match.group('path'))
+        handler = to_text(match.group('handler')).strip()
+        full_path = group_prefix + rel_path
+        routes.append(Route(method, full_path, 'Router route', handler, '', path, group_middleware))
+
+    return routes
+
+
+def parse_file(path: str) -> tuple[list[Route], list[Route]]:
+    with open(path, 'rb') as f:
+        data = f.read()
+    # Both attribute patterns need this literal; most PHP files never contain it.
+    routes = parse_attribute_routes(path, data) if b'#[Route' in data else []
+    router_routes = parse_router_routes(path, data) if os.path.basename(path) == 'routes.php' else []
+    return routes, router_routes
@@ -0,0 +1,96 @@
+# Behaviour checks for route_scanner; run with `python -m unittest test_route_scanner`
+# (or pytest) from this directory.
+import unittest
+
+from route_scanner import parse_attribute_routes, parse_router_routes
+
+
+def attribute_paths(source):
+    return [r.path for r in parse_attribute_routes('Controller.php', source)]
+
+
+class CommentSpanTests(unittest.TestCase):
+    def test_line_and_block_comments_hide_routes(self):
+        source = b"""<?php
+class C {
+    // #[Route('/slash')]
+    # #[Route('/hash')]
+    /* #[Route('/block')] */
+    /**
+     * Example: #[Route('/docblock')]
+     */
+    #[Route('/real')]
+    public function real() {}
+}
+"""
+        self.assertEqual(attribute_paths(source), ['/real'])
+
+    def test_comment_markers_inside_strings_are_ignored(self):
+        source = b"""<?php
+class C {
+    $u = 'http://x'; #[Route('/single')]
+    $v = "a \\" // b"; #[Route('/double')]
+    #[Route('/args', description: 'x // y')] #[Route('/after-args')]
+    public function f() {}
+}
+"""
+        self.assertEqual(attribute_paths(source), ['/single', '/double', '/args', '/after-args'])
+
+    def test_apostrophes_in_comments_and_heredocs_do_not_open_strings(self):
+        source = b"""<?php
+class C {
+    # don't
+    public function a() {
+        $html = <<<HTML
+        Don't #[Route('/heredoc')]
+        HTML;
+        $raw = <<<'TXT'
+it's #[Route('/nowdoc')]
+TXT;
+    }
+    /**
+     * Example: #[Route('/docblock')]
+     */
+    #[Route('/real')]
+    public function b() {}
+}
+"""
+        self.assertEqual(attribute_paths(source), ['/real'])
+
+
+class HandlerLookaheadTests(unittest.TestCase):
+    def test_handler_found_for_every_line_ending(self):
+        for newline in (b'\n', b'\r\n', b'\r'):
+            source = newline.join([
+                b'<?php', b'class C {', b"    #[Route('/a')]", b"    #[Route('/b', method: 'POST')]",
+                b'    public function g() {}', b'}',
+            ])
+            routes = parse_attribute_routes('Controller.php', source)
+            self.assertEqual([(r.path, r.method, r.handler) for r in routes],
+                             [('/a', 'GET', 'g'), ('/b', 'POST', 'g')], newline)
+
+
+class RouterGroupTests(unittest.TestCase):
+    def test_group_prefix_applies_only_inside_its_closure(self):
+        source = b"""<?php
+Router::group('/api', ['auth'], function () {
+    Router::group('/v2', ['json'], function () {
+        Router::post('/deep', [C::class, 'z']);
+    });
+    Router::get('/mid', [D::class, 'w']);
+});
+Router::group('/elsewhere', [], [Ctl::class, 'register']);
+Router::group('/arrow', ['m'], fn () => Router::put('/p', [P::class, 'p']));
+Router::get('/after', [E::class, 'v']);
+"""
+        routes = parse_router_routes('routes.php', source)
+        self.assertEqual([(r.method, r.path, r.middleware) for r in routes], [
+            ('POST', '/api/v2/deep', ['auth', 'json']),
+            ('GET', '/api/mid', ['auth']),
+            ('PUT', '/arrow/p', ['m']),
+            ('GET', '/after', []),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()